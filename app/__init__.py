@@ -1,15 +1,74 @@
 """Flask application initialization and configuration.
 
-This module initializes the Flask application, sets up extensions like Bcrypt,
-and registers blueprints. Blueprint imports are intentionally placed after
-app initialization to avoid circular dependencies.
+This module initializes the Flask application, loads its configuration, and
+registers blueprints. The bcrypt cost factor used for password hashing is read
+from the ``BCRYPT_LOG_ROUNDS`` environment variable (see ``calibrate_bcrypt.py``).
+JSON responses are serialized with orjson instead of the stdlib json module.
+Blueprint imports are intentionally placed after app initialization to avoid
+circular dependencies.
 """
 
+import os
+
+import orjson
 from flask import Flask
-from flask_bcrypt import Bcrypt
+from flask.json.provider import DefaultJSONProvider
+
+_COMPACT_SEPARATORS = (",", ":")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson, falling back to Flask's
+    default handling for types orjson does not support natively.
+
+    Dates and datetimes are passed through to Flask's ``default`` so they
+    keep the HTTP date format. orjson output is always compact, so ``dumps``
+    only uses it for ``sort_keys`` and compact ``separators``; calls with any
+    other keyword arguments (``indent``, ``object_hook`` for ``loads``, ...)
+    fall back to Flask's stdlib-json implementation.
+    """
+
+    def _options(self, sort_keys):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        extra = dict(kwargs)
+        sort_keys = extra.pop('sort_keys', self.sort_keys)
+        # Flask's session serializer asks for compact separators
+        if tuple(extra.get('separators', _COMPACT_SEPARATORS)) == _COMPACT_SEPARATORS:
+            extra.pop('separators', None)
+        if extra:
+            return super().dumps(obj, **kwargs)
+        option = self._options(sort_keys)
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        # Flask's session serializer passes object_hook
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._options(self.sort_keys)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+class App(Flask):
+    """Flask application using orjson for all JSON handling."""
+    json_provider_class = OrjsonProvider
+
 
-app = Flask(__name__)
-bcrypt = Bcrypt(app)
+app = App(__name__)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
 
 from app.routes.user import user_bp
 app.register_blueprint(user_bp)
@@ -0,0 +1,116 @@
+"""
+This module defines ConnectionPool, a fixed-size pool of SQLite connections
+shared between request threads. Under WAL, each pooled connection can read
+concurrently with the others while writers still take turns on the database.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied to every connection when it is opened. WAL lets readers proceed
+# while a write is in progress and, together with synchronous=NORMAL, avoids an
+# fsync on every commit.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+class ConnectionPool:
+    """ConnectionPool hands out SQLite connections to one thread at a time,
+    opening them lazily up to a fixed size."""
+    def __init__(self, db_path, size, timeout=5.0):
+        """
+        Initializes an empty pool for the specified database.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+            size (int): The maximum number of open connections.
+            timeout (float): Seconds to wait for a free connection once all of
+                             them are in use. Defaults to 5.0.
+        """
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """
+        Opens a new connection that returns rows as plain tuples and runs in
+        autocommit mode so that writes can manage their own transactions.
+
+        Returns:
+            sqlite3.Connection: A database connection object.
+        """
+        # Every query uses constant SQL text, so each one is parsed once per
+        # connection and then served from its statement cache.
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get(self):
+        """
+        Takes a connection out of the pool, opening a new one if the pool has
+        not reached its size yet and otherwise waiting up to ``timeout``
+        seconds for one to be put back.
+
+        Returns:
+            sqlite3.Connection: A connection owned by the caller until put back.
+
+        Raises:
+            sqlite3.OperationalError: If no connection became free in time.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._connect()
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                "timed out waiting for a database connection"
+            ) from None
+
+    def put(self, conn):
+        """
+        Returns a connection taken with get() to the pool.
+
+        Args:
+            conn (sqlite3.Connection): The connection to return.
+        """
+        self._idle.put(conn)
+
+    @contextmanager
+    def acquire(self):
+        """
+        Borrows a connection for the duration of the block.
+
+        Yields:
+            sqlite3.Connection: A connection owned by the caller.
+        """
+        conn = self.get()
+        try:
+            yield conn
+        finally:
+            self.put(conn)
@@ -1,49 +1,237 @@
 """
 This module defines the UserModel class for interacting with a SQLite database
 to manage user data, including creation, retrieval, updating, deletion,
-searching, and login verification. It uses bcrypt for password hashing.
+searching, and login verification. It uses bcrypt for password hashing,
+run in a pool of worker processes so concurrent logins hash in parallel.
 Author: Raj Kariya
 """
+import multiprocessing
+import os
+import re
 import sqlite3
-from app import bcrypt
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from cachetools import LRUCache
+import bcrypt
+
+from app import app
+from app.models.pool import ConnectionPool
+
+# INSERT/UPDATE ... RETURNING needs SQLite 3.35; fail at startup rather than
+# on the first write.
+if sqlite3.sqlite_version_info < (3, 35, 0):
+    raise RuntimeError(
+        f"SQLite 3.35 or newer is required, found {sqlite3.sqlite_version}"
+    )
+
+# Column order of the user queries, used to turn their plain tuple rows into
+# dicts.
+_USER_COLUMNS = ('id', 'name', 'email')
+
+# Characters stripped from search input before it reaches FTS5
+_CONTROL_CHARS = re.compile(r'[\x00-\x1f\x7f]')
+
+# Single-user lookup, the hottest read query
+_GET_USER_SQL = "SELECT id, name, email FROM users WHERE id = ?"
+
+# Rows fetched per call when streaming the user list.
+_FETCH_BATCH_SIZE = 256
+
+# Created on first use by _run_bcrypt(). The spawn context avoids forking a
+# multi-threaded server process, but it means each worker re-imports the
+# __main__ module, so scripts that hash passwords through UserModel must keep
+# their top-level code under an ``if __name__ == '__main__':`` guard.
+_bcrypt_pool = None
+_bcrypt_pool_lock = threading.Lock()
+
+def _new_bcrypt_pool():
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn')
+    )
+
+def _run_bcrypt(func, *args):
+    """
+    Runs a bcrypt function in the worker pool and returns its result. If a
+    worker has died and broken the pool, a new pool is started and the call
+    is retried once.
+
+    Args:
+        func (callable): ``bcrypt.hashpw`` or ``bcrypt.checkpw``.
+        *args: The arguments to pass to ``func``.
+
+    Returns:
+        The return value of ``func``.
+    """
+    global _bcrypt_pool
+    with _bcrypt_pool_lock:
+        if _bcrypt_pool is None:
+            _bcrypt_pool = _new_bcrypt_pool()
+        pool = _bcrypt_pool
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        with _bcrypt_pool_lock:
+            # Another thread may already have replaced the broken pool
+            if _bcrypt_pool is pool:
+                _bcrypt_pool = _new_bcrypt_pool()
+            pool = _bcrypt_pool
+        return pool.submit(func, *args).result()
+
+class _UserStream:
+    """Iterator over the rows of a list query that returns its pooled
+    connection when it is exhausted or closed, whichever happens first."""
+    def __init__(self, pool, conn, cursor):
+        self._pool = pool
+        self._conn = conn
+        self._cursor = cursor
+        self._rows = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows, None)
+        if row is None and self._conn is not None:
+            self._rows = iter(self._cursor.fetchmany(_FETCH_BATCH_SIZE))
+            row = next(self._rows, None)
+        if row is None:
+            self.close()
+            raise StopIteration
+        return dict(zip(_USER_COLUMNS, row))
+
+    def close(self):
+        """Close the cursor and return the connection to the pool. Safe to
+        call more than once."""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                self._cursor.close()
+            finally:
+                self._pool.put(conn)
+
+    def __del__(self):
+        self.close()
+
+# Checked against when the email is unknown, so failed logins take the same
+# time whether or not the account exists.
+_DUMMY_HASH = bcrypt.hashpw(b'x', bcrypt.gensalt(app.config['BCRYPT_LOG_ROUNDS']))
 
 class UserModel:
     """UserModel is responsible for interacting with the SQLite database
-    to perform CRUD operations on user data."""
-    def __init__(self, db_path='users.db'):
+    to perform CRUD operations on user data.
+
+    The user cache and the versions behind the ETags live in this object and
+    only see writes made through it. The app must therefore run as a single
+    process, and be restarted after anything else (such as init_db.py)
+    changes the database."""
+    def __init__(self, db_path='users.db', pool_size=8, stream_pool_size=4):
         """
         Initializes the UserModel with the specified database path.
 
         Args:
             db_path (str): The path to the SQLite database file. Defaults to 'users.db'.
+            pool_size (int): The maximum number of open database connections,
+                             which bounds how many reads run in parallel.
+                             Defaults to 8.
+            stream_pool_size (int): The maximum number of connections held by
+                                    streamed user lists. Defaults to 4.
         """
         self.db_path = db_path
+        self._pool = ConnectionPool(db_path, pool_size)
+        # Streamed lists hold their connection for as long as the client takes
+        # to read the body, so they draw from a separate pool and slow clients
+        # cannot starve the other queries.
+        self._stream_pool = ConnectionPool(db_path, stream_pool_size)
+        # Read cache, cleared by _invalidate() after every committed write.
+        self._user_cache = LRUCache(maxsize=128)
+        self._cache_lock = threading.RLock()
+        # Versions used to build ETags, bumped alongside cache invalidation.
+        # The epoch keeps tags from a previous process from matching.
+        self._epoch = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._user_versions = {}
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the enclosed statements in a single ``BEGIN IMMEDIATE`` transaction,
+        committing on success and rolling back if an exception is raised.
+
+        Yields:
+            sqlite3.Cursor: A cursor on a pooled connection.
+        """
+        with self._pool.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+    def _invalidate(self, user_id):
+        """
+        Drops cached data for a user after a write has been committed.
+
+        Args:
+            user_id (int): The ID of the user that was written.
+        """
+        with self._cache_lock:
+            self._user_cache.pop(user_id, None)
+            self._version += 1
+            self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+    def users_etag(self):
+        """
+        Returns an ETag value for the full user list, which changes whenever
+        any user is created, updated or deleted.
+
+        Returns:
+            str: The unquoted ETag value.
+        """
+        return f"{self._epoch}-{self._version}"
 
-    def get_connection(self):
+    def user_etag(self, user_id):
         """
-        Establishes and returns a connection to the SQLite database.
-        The connection is configured to return rows as dictionaries.
+        Returns an ETag value for a single user, which changes whenever that
+        user is written.
+
+        Args:
+            user_id (int): The ID of the user.
 
         Returns:
-            sqlite3.Connection: A database connection object.
+            str: The unquoted ETag value.
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return f"{self._epoch}-{user_id}-{self._user_versions.get(user_id, 0)}"
 
     def get_all_users(self):
         """
         Retrieves all users from the database, excluding their passwords.
 
+        The query runs immediately, but rows are fetched lazily in batches as
+        the returned iterator is consumed, so the full table is never held in
+        memory. The iterator holds a connection from the streaming pool until
+        it is exhausted, so callers that may stop early must call its
+        ``close()`` method. When every streaming connection is held, this
+        raises sqlite3.OperationalError after the pool timeout.
+
         Returns:
-            list: A list of dictionaries, where each dictionary represents a user
-                  with 'id', 'name', and 'email' fields. Returns an empty list
-                  if no users are found.
+            iterator: An iterator of dictionaries, where each dictionary
+                      represents a user with 'id', 'name', and 'email' fields.
         """
-        with self.get_connection() as conn:
+        conn = self._stream_pool.get()
+        try:
             cursor = conn.cursor()
             cursor.execute("SELECT id, name, email FROM users")
-            return [dict(row) for row in cursor.fetchall()]
+        except BaseException:
+            self._stream_pool.put(conn)
+            raise
+        return _UserStream(self._stream_pool, conn, cursor)
 
     def get_user_by_id(self, user_id):
         """
@@ -56,11 +244,25 @@ class UserModel:
             dict or None: A dictionary representing the user with 'id', 'name',
                           and 'email' fields if found, otherwise None.
         """
-        with self.get_connection() as conn:
+        with self._cache_lock:
+            user = self._user_cache.get(user_id)
+            if user is not None:
+                return user
+            version = self._user_versions.get(user_id, 0)
+
+        with self._pool.acquire() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, name, email FROM users WHERE id = ?", (user_id,))
-            user = cursor.fetchone()
-            return dict(user) if user else None
+            row = cursor.execute(_GET_USER_SQL, (user_id,)).fetchone()
+        if row is None:
+            return None
+        user = dict(zip(_USER_COLUMNS, row))
+
+        # Only cache the row if no write to this user was committed while it
+        # was being read; otherwise it may already be stale.
+        with self._cache_lock:
+            if self._user_versions.get(user_id, 0) == version:
+                self._user_cache[user_id] = user
+        return user
 
     def create_user(self, name, email, password):
         """
@@ -74,19 +276,24 @@ class UserModel:
         Returns:
             int: The ID of the newly created user.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-            cursor.execute(
-                "INSERT INTO users (name, email, password) VALUES (?, ?, ?)",
+        hashed_password = _run_bcrypt(
+            bcrypt.hashpw,
+            password.encode('utf-8'),
+            bcrypt.gensalt(app.config['BCRYPT_LOG_ROUNDS'])
+        )
+        with self._transaction() as cursor:
+            user_id = cursor.execute(
+                "INSERT INTO users (name, email, password) VALUES (?, ?, ?) RETURNING id",
                 (name, email, hashed_password)
-            )
-            conn.commit()
-            return cursor.lastrowid
+            ).fetchone()[0]
+        self._invalidate(user_id)
+        return user_id
 
     def update_user(self, user_id, name, email):
         """
-        Updates the name and email of an existing user.
+        Updates the name and email of an existing user. The row is only
+        written when the name or email actually changes, so a request that
+        resends the current values does not touch the database pages.
 
         Args:
             user_id (int): The ID of the user to update.
@@ -94,16 +301,21 @@ class UserModel:
             email (str): The new email address for the user.
 
         Returns:
-            bool: True if the user was updated successfully, False otherwise.
+            bool: True if the user exists (whether or not anything changed),
+                  False otherwise.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE users SET name = ?, email = ? WHERE id = ?",
-                (name, email, user_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        with self._transaction() as cursor:
+            updated = cursor.execute(
+                "UPDATE users SET name = ?, email = ? "
+                "WHERE id = ? AND (name <> ? OR email <> ?) RETURNING id",
+                (name, email, user_id, name, email)
+            ).fetchone() is not None
+            exists = updated or cursor.execute(
+                "SELECT 1 FROM users WHERE id = ?", (user_id,)
+            ).fetchone() is not None
+        if updated:
+            self._invalidate(user_id)
+        return exists
 
     def delete_user(self, user_id):
         """
@@ -115,31 +327,42 @@ class UserModel:
         Returns:
             bool: True if the user was deleted successfully, False otherwise.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        with self._transaction() as cursor:
             cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            self._invalidate(user_id)
+        return deleted
 
     def search_users(self, name):
         """
-        Searches for users whose names contain the given substring (case-insensitive).
+        Searches for users with a word in their name starting with the given
+        text (case-insensitive), using the ``users_fts`` full-text index.
 
         Args:
-            name (str): The substring to search for in user names.
+            name (str): The text to search for in user names.
 
         Returns:
             list: A list of dictionaries, where each dictionary represents a user
                   with 'id', 'name', and 'email' fields. Returns an empty list
                   if no matching users are found.
         """
-        with self.get_connection() as conn:
+        # FTS5 rejects control characters such as NUL even inside a phrase,
+        # and they never appear in an indexed name, so drop them first.
+        name = _CONTROL_CHARS.sub('', name)
+        if not name.strip():
+            return []
+        # Quote the input as an FTS5 phrase so its characters are never parsed
+        # as query syntax, then match it as a prefix.
+        query = '"' + name.replace('"', '""') + '"*'
+        with self._pool.acquire() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, name, email FROM users WHERE name LIKE ?",
-                (f"%{name}%",)
+                "SELECT u.id, u.name, u.email FROM users_fts f "
+                "JOIN users u ON u.id = f.rowid WHERE users_fts MATCH ?",
+                (query,)
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return [dict(zip(_USER_COLUMNS, row)) for row in cursor]
 
     def verify_login(self, email, password):
         """
@@ -150,14 +373,22 @@ class UserModel:
             password (str): The plain-text password provided by the user.
 
         Returns:
-            dict or None: A dictionary representing the user (including all fields
-                          from the database, including hashed password) if credentials
-                          are valid, otherwise None.
+            dict or None: A dictionary representing the user with 'id', 'name',
+                          and 'email' fields if credentials are valid, otherwise
+                          None. A bcrypt check is performed
+                          even for unknown emails to avoid a timing side channel.
         """
-        with self.get_connection() as conn:
+        with self._pool.acquire() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
+            cursor.execute(
+                "SELECT id, name, email, password FROM users WHERE email = ?", (email,)
+            )
             user = cursor.fetchone()
-            if user and bcrypt.check_password_hash(user['password'], password):
-                return dict(user)
-            return None
+        stored_hash = user[3] if user else _DUMMY_HASH
+        if isinstance(stored_hash, str):
+            # Hashes written before the password column became a BLOB
+            stored_hash = stored_hash.encode('utf-8')
+        ok = _run_bcrypt(bcrypt.checkpw, password.encode('utf-8'), stored_hash)
+        if user and ok:
+            return {'id': user[0], 'name': user[1], 'email': user[2]}
+        return None
@@ -8,57 +8,129 @@ This module provides REST API endpoints for user operations including:
 
 from http import HTTPStatus
 import sqlite3
-from flask import Blueprint, jsonify, request
-from marshmallow import ValidationError
+import msgspec
+import orjson
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from app.models.user import UserModel
-from app.schemas.user import LoginSchema, UserSchema, UserUpdateSchema
+from app.schemas.user import (
+    login_decoder, user_decoder, user_update_decoder, validation_messages
+)
 
 user_bp = Blueprint('user', __name__)
 user_model = UserModel()
-user_schema = UserSchema()
-user_update_schema = UserUpdateSchema()
-login_schema = LoginSchema()
+
+# Constant response bodies, encoded once at import. Each request still gets
+# its own Response object, since Flask may modify responses after the view.
+_HOME = orjson.dumps({"message": "User Management System"})
+_DB_ERROR = orjson.dumps({"error": "Database error"})
+_NO_INPUT = orjson.dumps({"error": "No input data provided"})
+_INVALID_JSON = orjson.dumps({"error": "Invalid JSON"})
+_USER_NOT_FOUND = orjson.dumps({"error": "User not found"})
+_USER_EXISTS = orjson.dumps({"error": "User with this email already exists"})
+_EMAIL_IN_USE = orjson.dumps({"error": "Email already in use"})
+_USER_UPDATED = orjson.dumps({"message": "User updated successfully"})
+_USER_DELETED = orjson.dumps({"message": "User deleted successfully"})
+_NO_SEARCH_NAME = orjson.dumps({"error": "Please provide a name to search"})
+_INVALID_CREDENTIALS = orjson.dumps({"error": "Invalid credentials", "status": "failed"})
+
+def _json_response(body, status=HTTPStatus.OK):
+    """Wrap an already-encoded JSON body in a response."""
+    return Response(body, status=status, mimetype='application/json')
+
+def _not_modified(etag):
+    """Build an empty 304 response carrying the given weak ETag."""
+    response = Response(status=HTTPStatus.NOT_MODIFIED)
+    response.set_etag(etag, weak=True)
+    return response
+
+def _etag_matches(etag):
+    """Check whether If-None-Match names the given tag. A ``*`` is ignored
+    here, since it only matches once the resource is known to exist."""
+    if_none_match = request.if_none_match
+    return not if_none_match.star_tag and if_none_match.contains_weak(etag)
+
+def _stream_json_array(items):
+    """Yield a JSON array one orjson-encoded item at a time, closing
+    ``items`` if the consumer stops early."""
+    try:
+        yield b'['
+        separator = b''
+        for item in items:
+            yield separator + orjson.dumps(item)
+            separator = b','
+        yield b']'
+    finally:
+        items.close()
 
 @user_bp.route('/')
 def home():
     """Health check endpoint for the User Management System."""
-    return jsonify({"message": "User Management System"}), HTTPStatus.OK
+    return _json_response(_HOME)
 
 @user_bp.route('/users', methods=['GET'])
 def get_all_users():
     """Retrieve all users from the system.
 
+    Responds with 304 Not Modified when the client's If-None-Match header
+    matches the current ETag of the user list. Otherwise the list is
+    streamed as it is read from the database, holding one of a small number
+    of dedicated connections until the client has read the whole body.
+
     Returns:
         tuple: JSON response containing list of users and HTTP status code
     """
     try:
+        # Read the tag before querying so a concurrent write can only
+        # make it older than the data, never newer.
+        etag = user_model.users_etag()
+        # The user list always has a representation, so ``*`` matches it too
+        if request.if_none_match.star_tag or _etag_matches(etag):
+            return _not_modified(etag)
+
         users = user_model.get_all_users()
-        return jsonify(users), HTTPStatus.OK
+        response = _json_response(stream_with_context(_stream_json_array(users)))
+        # The body may never be iterated (HEAD requests, aborted clients), so
+        # also release the connection when the response itself is closed.
+        response.call_on_close(users.close)
+        response.set_etag(etag, weak=True)
+        return response, HTTPStatus.OK
     except (ValueError, KeyError) as e:
         return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
 
 @user_bp.route('/user/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     """Retrieve a specific user by their ID.
 
+    Responds with 304 Not Modified when the client's If-None-Match header
+    matches the current ETag of the user. Responses are encoded with orjson
+    directly rather than through jsonify.
+
     Args:
         user_id (int): The ID of the user to retrieve
 
     Returns:
-        tuple: JSON response containing user data and HTTP status code
+        Response: JSON response containing user data and HTTP status code
     """
     try:
+        etag = user_model.user_etag(user_id)
+        if _etag_matches(etag):
+            return _not_modified(etag)
+
         user = user_model.get_user_by_id(user_id)
-        if user:
-            return jsonify(user), HTTPStatus.OK
-        return jsonify({"error": "User not found"}), HTTPStatus.NOT_FOUND
+        if user is None:
+            return _json_response(_USER_NOT_FOUND, HTTPStatus.NOT_FOUND)
+        if request.if_none_match.star_tag:
+            return _not_modified(etag)
+        response = _json_response(orjson.dumps(user))
+        response.set_etag(etag, weak=True)
+        return response
     except (ValueError, KeyError) as e:
         return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
@@ -68,30 +140,32 @@ def create_user():
         tuple: JSON response containing result message and HTTP status code
     """
     try:
-        data = request.get_json()
+        data = request.get_data()
         if not data:
-            return jsonify({"error": "No input data provided"}), HTTPStatus.BAD_REQUEST
+            return _json_response(_NO_INPUT, HTTPStatus.BAD_REQUEST)
 
-        validated_data = user_schema.load(data)
+        validated_data = user_decoder.decode(data)
         user_id = user_model.create_user(
-            validated_data['name'],
-            validated_data['email'],
-            validated_data['password']
+            validated_data.name,
+            validated_data.email,
+            validated_data.password
         )
 
         return jsonify({
             "message": "User created successfully",
             "user_id": user_id
         }), HTTPStatus.CREATED
-    except ValidationError as err:
+    except msgspec.ValidationError as err:
         return jsonify({
             "error": "Validation error",
-            "messages": err.messages
+            "messages": validation_messages(err)
         }), HTTPStatus.BAD_REQUEST
+    except msgspec.DecodeError:
+        return _json_response(_INVALID_JSON, HTTPStatus.BAD_REQUEST)
     except sqlite3.IntegrityError:
-        return jsonify({"error": "User with this email already exists"}), HTTPStatus.CONFLICT
+        return _json_response(_USER_EXISTS, HTTPStatus.CONFLICT)
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
 
 @user_bp.route('/user/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
@@ -104,29 +178,31 @@ def update_user(user_id):
         tuple: JSON response containing result message and HTTP status code
     """
     try:
-        data = request.get_json()
+        data = request.get_data()
         if not data:
-            return jsonify({"error": "No input data provided"}), HTTPStatus.BAD_REQUEST
+            return _json_response(_NO_INPUT, HTTPStatus.BAD_REQUEST)
 
-        validated_data = user_update_schema.load(data)
+        validated_data = user_update_decoder.decode(data)
         success = user_model.update_user(
             user_id,
-            validated_data['name'],
-            validated_data['email']
+            validated_data.name,
+            validated_data.email
         )
 
         if success:
-            return jsonify({"message": "User updated successfully"}), HTTPStatus.OK
-        return jsonify({"error": "User not found"}), HTTPStatus.NOT_FOUND
-    except ValidationError as err:
+            return _json_response(_USER_UPDATED)
+        return _json_response(_USER_NOT_FOUND, HTTPStatus.NOT_FOUND)
+    except msgspec.ValidationError as err:
         return jsonify({
             "error": "Validation error",
-            "messages": err.messages
+            "messages": validation_messages(err)
         }), HTTPStatus.BAD_REQUEST
+    except msgspec.DecodeError:
+        return _json_response(_INVALID_JSON, HTTPStatus.BAD_REQUEST)
     except sqlite3.IntegrityError:
-        return jsonify({"error": "Email already in use"}), HTTPStatus.CONFLICT
+        return _json_response(_EMAIL_IN_USE, HTTPStatus.CONFLICT)
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
 
 @user_bp.route('/user/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
@@ -141,10 +217,10 @@ def delete_user(user_id):
     try:
         success = user_model.delete_user(user_id)
         if success:
-            return jsonify({"message": "User deleted successfully"}), HTTPStatus.OK
-        return jsonify({"error": "User not found"}), HTTPStatus.NOT_FOUND
+            return _json_response(_USER_DELETED)
+        return _json_response(_USER_NOT_FOUND, HTTPStatus.NOT_FOUND)
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
 
 @user_bp.route('/search', methods=['GET'])
 def search_users():
@@ -156,12 +232,12 @@ def search_users():
     try:
         name = request.args.get('name')
         if not name:
-            return jsonify({"error": "Please provide a name to search"}), HTTPStatus.BAD_REQUEST
+            return _json_response(_NO_SEARCH_NAME, HTTPStatus.BAD_REQUEST)
 
         users = user_model.search_users(name)
         return jsonify(users), HTTPStatus.OK
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
 
 @user_bp.route('/login', methods=['POST'])
 def login():
@@ -171,14 +247,14 @@ def login():
         tuple: JSON response containing authentication result and HTTP status code
     """
     try:
-        data = request.get_json()
+        data = request.get_data()
         if not data:
-            return jsonify({"error": "No input data provided"}), HTTPStatus.BAD_REQUEST
+            return _json_response(_NO_INPUT, HTTPStatus.BAD_REQUEST)
 
-        validated_data = login_schema.load(data)
+        validated_data = login_decoder.decode(data)
         user = user_model.verify_login(
-            validated_data['email'],
-            validated_data['password']
+            validated_data.email,
+            validated_data.password
         )
 
         if user:
@@ -188,14 +264,13 @@ def login():
                 "message": "Login successful"
             }), HTTPStatus.OK
 
-        return jsonify({
-            "status": "failed",
-            "error": "Invalid credentials"
-        }), HTTPStatus.UNAUTHORIZED
-    except ValidationError as err:
+        return _json_response(_INVALID_CREDENTIALS, HTTPStatus.UNAUTHORIZED)
+    except msgspec.ValidationError as err:
         return jsonify({
             "error": "Validation error",
-            "messages": err.messages
+            "messages": validation_messages(err)
         }), HTTPStatus.BAD_REQUEST
+    except msgspec.DecodeError:
+        return _json_response(_INVALID_JSON, HTTPStatus.BAD_REQUEST)
     except sqlite3.Error:
-        return jsonify({"error": "Database error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        return _json_response(_DB_ERROR, HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -1,15 +1,49 @@
-from marshmallow import Schema, fields, validate
+import re
+from typing import Annotated
 
-class UserSchema(Schema):
-    id = fields.Int(dump_only=True)
-    name = fields.Str(required=True, validate=validate.Length(min=1))
-    email = fields.Email(required=True)
-    password = fields.Str(required=True, load_only=True, validate=validate.Length(min=6))
+import msgspec
 
-class UserUpdateSchema(Schema):
-    name = fields.Str(required=True, validate=validate.Length(min=1))
-    email = fields.Email(required=True)
+Name = Annotated[str, msgspec.Meta(min_length=1)]
+# \A and \Z rather than ^ and $, which would accept a trailing newline
+Email = Annotated[str, msgspec.Meta(pattern=r'\A[^@\s]+@[^@\s]+\.[^@\s]+\Z')]
+Password = Annotated[str, msgspec.Meta(min_length=6)]
 
-class LoginSchema(Schema):
-    email = fields.Email(required=True)
-    password = fields.Str(required=True)
+class UserSchema(msgspec.Struct, forbid_unknown_fields=True):
+    name: Name
+    email: Email
+    password: Password
+
+class UserUpdateSchema(msgspec.Struct, forbid_unknown_fields=True):
+    name: Name
+    email: Email
+
+class LoginSchema(msgspec.Struct, forbid_unknown_fields=True):
+    email: Email
+    password: str
+
+user_decoder = msgspec.json.Decoder(UserSchema)
+user_update_decoder = msgspec.json.Decoder(UserUpdateSchema)
+login_decoder = msgspec.json.Decoder(LoginSchema)
+
+_FIELD_ERROR = re.compile(r'(?P<message>.*) - at `\$\.(?P<field>[^.`\[]+)[^`]*`')
+_MISSING_FIELD = re.compile(r'Object missing required field `(?P<field>[^`]+)`')
+_UNKNOWN_FIELD = re.compile(r'Object contains unknown field `(?P<field>[^`]+)`')
+
+def validation_messages(err):
+    """Convert a msgspec.ValidationError into a marshmallow-style mapping of
+    field names to lists of messages, with "_schema" for whole-body errors."""
+    message = str(err)
+    match = _MISSING_FIELD.fullmatch(message)
+    if match:
+        return {match['field']: ["Missing data for required field."]}
+    match = _UNKNOWN_FIELD.fullmatch(message)
+    if match:
+        return {match['field']: ["Unknown field."]}
+    match = _FIELD_ERROR.fullmatch(message)
+    if match:
+        field_message = match['message']
+        # Email is the only pattern-constrained field; don't echo the regex
+        if field_message.startswith("Expected `str` matching regex"):
+            field_message = "Not a valid email address."
+        return {match['field']: [field_message]}
+    return {"_schema": [message]}
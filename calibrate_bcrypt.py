@@ -0,0 +1,59 @@
+"""
+Bcrypt cost calibration script.
+
+Times password hashing at increasing cost factors on the current machine and
+prints the highest ``BCRYPT_LOG_ROUNDS`` value that stays within the target
+hashing time (250ms by default). Run it once on the deployment host and export
+the result before starting the app.
+
+Usage:
+    python calibrate_bcrypt.py [target_ms]
+"""
+import sys
+import time
+
+import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+
+def time_rounds(rounds):
+    """
+    Measures how long a single bcrypt hash takes at the given cost factor.
+
+    Args:
+        rounds (int): The bcrypt cost factor (log2 of the iteration count).
+
+    Returns:
+        float: The elapsed time in milliseconds.
+    """
+    start = time.perf_counter()
+    bcrypt.hashpw(b'x', bcrypt.gensalt(rounds))
+    return (time.perf_counter() - start) * 1000
+
+
+def calibrate(target_ms):
+    """
+    Finds the highest cost factor whose hashing time does not exceed the target.
+
+    Args:
+        target_ms (float): The maximum acceptable hashing time in milliseconds.
+
+    Returns:
+        int: The chosen cost factor, never lower than MIN_ROUNDS.
+    """
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = time_rounds(rounds)
+        print(f"rounds={rounds:2d}  {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == '__main__':
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    rounds = calibrate(target)
+    print(f"\nexport BCRYPT_LOG_ROUNDS={rounds}")
@@ -1,41 +1,112 @@
+import os
 import sqlite3
-from flask import Flask
-from flask_bcrypt import Bcrypt
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
-app = Flask(__name__)
-bcrypt = Bcrypt(app)
+import bcrypt
+
+BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
 
 def hash_password(password):
-    return bcrypt.generate_password_hash(password).decode('utf-8')
-
-conn = sqlite3.connect('users.db')
-cursor = conn.cursor()
-
-# Drop existing table if it exists
-cursor.execute('DROP TABLE IF EXISTS users')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT NOT NULL UNIQUE,
-    password TEXT NOT NULL
-)
-''')
-
-# Insert sample data with hashed passwords
-sample_users = [
-    ('John Doe', 'john@example.com', hash_password('password123')),
-    ('Jane Smith', 'jane@example.com', hash_password('secret456')),
-    ('Bob Johnson', 'bob@example.com', hash_password('qwerty789'))
-]
-
-cursor.executemany(
-    "INSERT INTO users (name, email, password) VALUES (?, ?, ?)",
-    sample_users
-)
-
-conn.commit()
-conn.close()
-
-print("Database initialized with sample data")
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_LOG_ROUNDS))
+
+def create_search_index(cursor):
+    """Create the users_fts full-text index and its sync triggers if they are
+    missing, then rebuild it from the users table. Safe to run on a database
+    that already has data."""
+    # Full-text index over user names, kept in sync with the users table by triggers
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(name, content='users', content_rowid='id')
+    ''')
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS users_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    ''')
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS users_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    ''')
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS users_au AFTER UPDATE OF name ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    ''')
+
+    cursor.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+
+def upgrade():
+    """Add the search index to an existing users.db without touching its data."""
+    conn = sqlite3.connect('users.db', isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    create_search_index(cursor)
+    cursor.execute('COMMIT')
+    conn.close()
+
+    print("Database upgraded")
+
+def main():
+    """Rebuild users.db and seed it with sample users."""
+    sample_users = [
+        ('John Doe', 'john@example.com', 'password123'),
+        ('Jane Smith', 'jane@example.com', 'secret456'),
+        ('Bob Johnson', 'bob@example.com', 'qwerty789')
+    ]
+
+    # Hash the passwords in parallel across all cores before opening the database
+    with ProcessPoolExecutor() as executor:
+        hashed_passwords = list(
+            executor.map(hash_password, [password for _, _, password in sample_users])
+        )
+
+    # Autocommit mode so the transaction below is controlled explicitly
+    conn = sqlite3.connect('users.db', isolation_level=None)
+    cursor = conn.cursor()
+
+    # Durability is not a concern for a one-shot initializer, so skip fsyncs
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=OFF')
+
+    # Rebuild the schema and seed it in a single transaction
+    cursor.execute('BEGIN')
+
+    # Drop existing tables if they exist
+    cursor.execute('DROP TABLE IF EXISTS users_fts')
+    cursor.execute('DROP TABLE IF EXISTS users')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL UNIQUE,
+        password BLOB NOT NULL
+    )
+    ''')
+
+    create_search_index(cursor)
+
+    # Insert sample data with hashed passwords
+    cursor.executemany(
+        "INSERT INTO users (name, email, password) VALUES (?, ?, ?)",
+        (
+            (name, email, hashed_password)
+            for (name, email, _), hashed_password in zip(sample_users, hashed_passwords)
+        )
+    )
+
+    cursor.execute('COMMIT')
+    conn.close()
+
+    print("Database initialized with sample data")
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--upgrade']:
+        upgrade()
+    else:
+        main()
@@ -0,0 +1,34 @@
+import os
+
+# Keep hashing fast in tests; must be set before the app is imported.
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+
+import pytest
+
+import init_db
+from app import app as flask_app
+from app.models.user import UserModel
+from app.routes import user as user_routes
+
+
+@pytest.fixture
+def user_model(tmp_path, monkeypatch):
+    """A UserModel over a freshly seeded database in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    init_db.main()
+    model = UserModel(str(tmp_path / 'users.db'), pool_size=2)
+    model._pool.timeout = model._stream_pool.timeout = 0.5
+    monkeypatch.setattr(user_routes, 'user_model', model)
+    return model
+
+
+@pytest.fixture
+def client(user_model):
+    return flask_app.test_client()
+
+
+def all_connections_idle(model):
+    return all(
+        pool._idle.qsize() == pool._opened
+        for pool in (model._pool, model._stream_pool)
+    )
@@ -0,0 +1,38 @@
+import sqlite3
+
+import bcrypt
+import orjson
+
+import init_db
+
+
+def test_upgrade_adds_search_index_to_existing_database(tmp_path, monkeypatch, client):
+    monkeypatch.chdir(tmp_path)
+    # A users.db created before the search index, with TEXT password hashes
+    (tmp_path / 'users.db').unlink()
+    conn = sqlite3.connect('users.db')
+    conn.execute('''
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL
+    )
+    ''')
+    conn.execute(
+        "INSERT INTO users (name, email, password) VALUES (?, ?, ?)",
+        ('Old Timer', 'old@example.com', bcrypt.hashpw(b'password1', bcrypt.gensalt(4)).decode())
+    )
+    conn.commit()
+    conn.close()
+
+    init_db.upgrade()
+    init_db.upgrade()
+
+    response = client.get('/search?name=old')
+    assert response.status_code == 200
+    assert [user['email'] for user in orjson.loads(response.data)] == ['old@example.com']
+    response = client.post(
+        '/login', json={'email': 'old@example.com', 'password': 'password1'}
+    )
+    assert response.status_code == 200
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+from flask import json, jsonify, session
+
+from app import App, app
+
+
+def test_datetimes_use_http_date_format():
+    with app.app_context():
+        response = jsonify({'at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)})
+    assert response.get_json() == {'at': 'Tue, 02 Jan 2024 03:04:05 GMT'}
+
+
+def test_dumps_accepts_compact_separators():
+    with app.app_context():
+        assert json.dumps({'b': 1, 'a': [1, 2]}, separators=(',', ':')) == '{"a":[1,2],"b":1}'
+
+
+def test_other_arguments_fall_back_to_stdlib_json():
+    with app.app_context():
+        assert json.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
+        assert json.loads('{"a": 1}', object_hook=lambda d: sorted(d)) == ['a']
+
+
+def test_session_round_trip():
+    session_app = App(__name__)
+    session_app.secret_key = 'test'
+
+    @session_app.route('/set')
+    def set_session():
+        session['user'] = {'id': 1, 'at': datetime(2024, 1, 2, tzinfo=timezone.utc)}
+        return ''
+
+    @session_app.route('/get')
+    def get_session():
+        return jsonify(session['user'])
+
+    client = session_app.test_client()
+    assert client.get('/set').status_code == 200
+    response = client.get('/get')
+    assert response.status_code == 200
+    assert response.get_json() == {'id': 1, 'at': 'Tue, 02 Jan 2024 00:00:00 GMT'}
@@ -0,0 +1,20 @@
+import sqlite3
+
+import pytest
+
+from app.models.pool import ConnectionPool
+
+
+def test_get_reuses_returned_connection(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), size=1)
+    with pool.acquire() as conn:
+        pass
+    with pool.acquire() as again:
+        assert again is conn
+
+
+def test_get_times_out_when_exhausted(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), size=1, timeout=0.1)
+    with pool.acquire():
+        with pytest.raises(sqlite3.OperationalError):
+            pool.get()
@@ -0,0 +1,186 @@
+import orjson
+
+from app.models import user as user_module
+from conftest import all_connections_idle
+
+
+def test_get_all_users(client, user_model):
+    response = client.get('/users')
+    assert response.status_code == 200
+    assert [user['email'] for user in orjson.loads(response.data)] == [
+        'john@example.com', 'jane@example.com', 'bob@example.com'
+    ]
+    assert all_connections_idle(user_model)
+
+
+def test_head_users_releases_connection(client, user_model):
+    # More HEAD requests than the pool has connections
+    for _ in range(user_model._stream_pool.size + 1):
+        with client.head('/users') as response:
+            assert response.status_code == 200
+    assert all_connections_idle(user_model)
+    assert client.get('/user/1').status_code == 200
+
+
+def test_partially_read_users_releases_connection(client, user_model):
+    for _ in range(user_model._stream_pool.size + 1):
+        response = client.get('/users')
+        next(response.iter_encoded())
+        response.close()
+    assert all_connections_idle(user_model)
+    assert client.get('/user/1').status_code == 200
+
+
+def test_stalled_streams_do_not_block_other_reads(client, user_model):
+    # Streams a slow client has started but not finished reading
+    stalled = [user_model.get_all_users() for _ in range(user_model._stream_pool.size)]
+    for users in stalled:
+        next(users)
+
+    assert client.get('/users').status_code == 500
+    assert client.get('/user/1').status_code == 200
+    assert client.get('/search?name=jane').status_code == 200
+
+    for users in stalled:
+        users.close()
+    assert all_connections_idle(user_model)
+
+
+def test_login(client):
+    response = client.post(
+        '/login', json={'email': 'john@example.com', 'password': 'password123'}
+    )
+    assert response.status_code == 200
+    response = client.post(
+        '/login', json={'email': 'john@example.com', 'password': 'wrong'}
+    )
+    assert response.status_code == 401
+
+
+def test_login_recovers_from_dead_bcrypt_worker(client):
+    credentials = {'email': 'john@example.com', 'password': 'password123'}
+    assert client.post('/login', json=credentials).status_code == 200
+
+    # Killing a worker breaks the whole ProcessPoolExecutor
+    worker = next(iter(user_module._bcrypt_pool._processes.values()))
+    worker.kill()
+    worker.join()
+
+    assert client.post('/login', json=credentials).status_code == 200
+
+
+def test_create_user_rejects_email_with_trailing_newline(client):
+    response = client.post(
+        '/users',
+        json={'name': 'Al', 'email': 'al@example.com\n', 'password': 'secret123'}
+    )
+    assert response.status_code == 400
+    assert orjson.loads(response.data)['messages'] == {
+        'email': ['Not a valid email address.']
+    }
+
+
+def test_validation_messages_are_keyed_by_field(client):
+    response = client.post('/users', json={'name': 'Al', 'email': 'al@example.com'})
+    assert orjson.loads(response.data)['messages'] == {
+        'password': ['Missing data for required field.']
+    }
+    response = client.post(
+        '/users',
+        json={'name': 'Al', 'email': 'al@example.com', 'password': 'short'}
+    )
+    assert orjson.loads(response.data)['messages'] == {
+        'password': ['Expected `str` of length >= 6']
+    }
+    response = client.put(
+        '/user/1', json={'name': 'Al', 'email': 'al@example.com', 'id': 1}
+    )
+    assert orjson.loads(response.data)['messages'] == {'id': ['Unknown field.']}
+
+
+def test_user_etag_and_not_modified(client):
+    response = client.get('/user/1')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+
+    response = client.get('/user/1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    client.put('/user/1', json={'name': 'John Q. Doe', 'email': 'john@example.com'})
+    response = client.get('/user/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert orjson.loads(response.data)['name'] == 'John Q. Doe'
+
+
+def test_users_etag_changes_after_delete(client):
+    etag = client.get('/users').headers['ETag']
+    assert client.get('/users', headers={'If-None-Match': etag}).status_code == 304
+
+    assert client.delete('/user/3').status_code == 200
+    response = client.get('/users', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(orjson.loads(response.data)) == 2
+
+
+def test_if_none_match_star(client):
+    assert client.get('/user/1', headers={'If-None-Match': '*'}).status_code == 304
+    assert client.get('/user/999', headers={'If-None-Match': '*'}).status_code == 404
+    assert client.delete('/user/3').status_code == 200
+    assert client.get('/user/3', headers={'If-None-Match': '*'}).status_code == 404
+    assert client.get('/users', headers={'If-None-Match': '*'}).status_code == 304
+
+
+def search_names(client, name):
+    response = client.get('/search', query_string={'name': name})
+    assert response.status_code == 200
+    return sorted(user['name'] for user in orjson.loads(response.data))
+
+
+def test_search_users_by_name_prefix(client):
+    assert search_names(client, 'jo') == ['Bob Johnson', 'John Doe']
+    assert search_names(client, 'SMI') == ['Jane Smith']
+    assert search_names(client, 'x"y') == []
+
+
+def test_search_ignores_control_characters(client):
+    assert search_names(client, '\x00') == []
+    assert search_names(client, 'ja\x00') == ['Jane Smith']
+
+
+def test_search_index_follows_user_changes(client):
+    response = client.post('/users', json={
+        'name': 'Alice Walker', 'email': 'alice@example.com', 'password': 'hunter22'})
+    assert response.status_code == 201
+    assert search_names(client, 'walk') == ['Alice Walker']
+
+    client.put('/user/2', json={'name': 'Jane Doe', 'email': 'jane@example.com'})
+    assert search_names(client, 'smith') == []
+    assert search_names(client, 'doe') == ['Jane Doe', 'John Doe']
+
+    client.delete('/user/1')
+    assert search_names(client, 'doe') == ['Jane Doe']
+
+
+def test_update_user(client):
+    etag = client.get('/user/1').headers['ETag']
+
+    response = client.put('/user/1', json={'name': 'John Doe', 'email': 'john@example.com'})
+    assert response.status_code == 200
+    assert client.get('/user/1', headers={'If-None-Match': etag}).status_code == 304
+
+    response = client.put('/user/1', json={'name': 'Johnny Doe', 'email': 'john@example.com'})
+    assert response.status_code == 200
+    response = client.get('/user/1')
+    assert response.headers['ETag'] != etag
+    assert orjson.loads(response.data)['name'] == 'Johnny Doe'
+
+    response = client.put('/user/999', json={'name': 'Nobody', 'email': 'nobody@example.com'})
+    assert response.status_code == 404
+
+    response = client.put('/user/1', json={'name': 'John Doe', 'email': 'jane@example.com'})
+    assert response.status_code == 409